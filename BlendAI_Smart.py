@@ -7,12 +7,29 @@ import logging
 import argparse
 import requests
 import json
+import math
+import re
 import subprocess
 from pathlib import Path
-from mathutils import Vector
+from mathutils import Vector, Euler
 from typing import List, Optional, Tuple, Dict
 import tempfile
 import shutil
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+# Optional: sentence-transformers enables the semantic prompt cache
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+# Optional: scikit-image marching cubes replaces the metaball human
+try:
+    from skimage.measure import marching_cubes
+except ImportError:
+    marching_cubes = None
 
 # Configure logging for server environment
 logging.basicConfig(
@@ -25,55 +42,660 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Semantic prompt cache settings
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SEMANTIC_CACHE_THRESHOLD = 0.87
+SEMANTIC_CACHE_SIZE = 10000
+EMBEDDING_BATCH_SIZE = 64
+
+# Persistent output cache: oldest-used entries beyond this count are evicted
+DISK_CACHE_MAX_ENTRIES = 500
+
+# Collection that holds everything a generation creates
+WORKSPACE_COLLECTION = "BlendAI_Workspace"
+
+# Output file names keep only word characters (any script) and dashes
+_SLUG_RE = re.compile(r'[^\w-]+')
+
+# Exit status of a --prompts-file run that stopped at --max-per-process with prompts left
+# (the second one when some prompts of this slice failed)
+BATCH_EXIT_MORE = 3
+BATCH_EXIT_MORE_FAILED = 4
+
+# Cycles GPU backends in order of preference
+GPU_DEVICE_TYPES = ('OPTIX', 'CUDA', 'HIP', 'METAL', 'ONEAPI')
+
+# Unit primitives spanning [-1, 1] on every axis, keyed by (kind, resolution).
+# Built once and reused so procedural models skip the bpy.ops primitive operators.
+# Values are (verts, loop_vertices, loop_totals) ready for _build_mesh_fast.
+_PRIMITIVE_CACHE: Dict[tuple, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+def _build_unit_cube(resolution: int) -> Tuple[np.ndarray, List[tuple]]:
+    verts = np.array([(-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1),
+                      (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)], dtype=np.float32)
+    faces = [(0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4),
+             (2, 3, 7, 6), (1, 2, 6, 5), (3, 0, 4, 7)]
+    return verts, faces
+
+def _build_unit_cylinder(resolution: int) -> Tuple[np.ndarray, List[tuple]]:
+    n = resolution
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    ring = np.column_stack((np.cos(angles), np.sin(angles)))
+    verts = np.vstack((np.column_stack((ring, np.full(n, -1.0))),
+                       np.column_stack((ring, np.full(n, 1.0))))).astype(np.float32)
+    faces = [(i, (i + 1) % n, n + (i + 1) % n, n + i) for i in range(n)]
+    faces.append(tuple(range(n, 2 * n)))
+    faces.append(tuple(reversed(range(n))))
+    return verts, faces
+
+def _build_unit_uv_sphere(resolution: int) -> Tuple[np.ndarray, List[tuple]]:
+    segments, rings = resolution, max(resolution // 2, 2)
+    angles = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    phi = np.linspace(0, np.pi, rings + 1)[1:-1, None]
+    ring_verts = np.stack((np.sin(phi) * np.cos(angles),
+                           np.sin(phi) * np.sin(angles),
+                           np.broadcast_to(np.cos(phi), (rings - 1, segments))), axis=-1)
+    verts = np.vstack(((0, 0, 1), ring_verts.reshape(-1, 3), (0, 0, -1))).astype(np.float32)
+    bottom = len(verts) - 1
+    faces = [(0, 1 + j, 1 + (j + 1) % segments) for j in range(segments)]
+    for r in range(rings - 2):
+        upper, lower = 1 + r * segments, 1 + (r + 1) * segments
+        faces.extend((lower + j, lower + (j + 1) % segments, upper + (j + 1) % segments, upper + j)
+                     for j in range(segments))
+    last = 1 + (rings - 2) * segments
+    faces.extend((bottom, last + (j + 1) % segments, last + j) for j in range(segments))
+    return verts, faces
+
+def _build_unit_cone(resolution: int) -> Tuple[np.ndarray, List[tuple]]:
+    n = resolution
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    verts = np.vstack((np.column_stack((np.cos(angles), np.sin(angles), np.full(n, -1.0))),
+                       (0, 0, 1))).astype(np.float32)
+    faces = [(i, (i + 1) % n, n) for i in range(n)]
+    faces.append(tuple(reversed(range(n))))
+    return verts, faces
+
+_PRIMITIVE_BUILDERS = {
+    'cube': _build_unit_cube,
+    'cyl': _build_unit_cylinder,
+    'sphere': _build_unit_uv_sphere,
+    'cone': _build_unit_cone,
+}
+
+def _face_arrays(faces: List[tuple]) -> Tuple[np.ndarray, np.ndarray]:
+    """Flatten polygon tuples into (loop_vertices, loop_totals) int32 arrays"""
+    loops = np.fromiter((i for face in faces for i in face), dtype=np.int32)
+    totals = np.fromiter((len(face) for face in faces), dtype=np.int32, count=len(faces))
+    return loops, totals
+
+def _unit_primitive(kind: str, resolution: int = 32) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return cached (verts, loop_vertices, loop_totals) for a unit primitive"""
+    key = (kind, resolution)
+    if key not in _PRIMITIVE_CACHE:
+        verts, faces = _PRIMITIVE_BUILDERS[kind](resolution)
+        _PRIMITIVE_CACHE[key] = (verts, *_face_arrays(faces))
+    return _PRIMITIVE_CACHE[key]
+
+# Specialized once at import: instances only apply a NumPy scale/offset to these tables
+_UNIT_CUBE = _unit_primitive('cube')
+_UNIT_CYLINDER = _unit_primitive('cyl')
+_UNIT_UV_SPHERE = _unit_primitive('sphere')
+_UNIT_CONE = _unit_primitive('cone')
+
+def _transform_primitive(primitive: Tuple[np.ndarray, np.ndarray, np.ndarray], scale=(1, 1, 1),
+                         location=(0, 0, 0), rotation=None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Scale, rotate and offset a primitive's vertex table, sharing its loop arrays"""
+    verts, loops, totals = primitive
+    verts = verts * np.asarray(scale, dtype=np.float32)
+    if rotation is not None:
+        verts = verts @ np.array(Euler(rotation).to_matrix(), dtype=np.float32).T
+    return verts + np.asarray(location, dtype=np.float32), loops, totals
+
+def _concat_primitives(parts) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Merge transformed primitives into one table, offsetting each part's loop indices"""
+    offsets = np.cumsum([0] + [len(verts) for verts, _, _ in parts[:-1]])
+    verts = np.concatenate([verts for verts, _, _ in parts])
+    loops = np.concatenate([part_loops + offset for (_, part_loops, _), offset in zip(parts, offsets)])
+    totals = np.concatenate([totals for _, _, totals in parts])
+    return verts, loops.astype(np.int32), totals
+
+def _build_mesh_fast(name: str, verts: np.ndarray, loops: np.ndarray, totals: np.ndarray) -> bpy.types.Mesh:
+    """Create a mesh by copying contiguous NumPy buffers straight into RNA with foreach_set"""
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", np.ascontiguousarray(verts, dtype=np.float32).ravel())
+    mesh.loops.add(len(loops))
+    mesh.loops.foreach_set("vertex_index", np.ascontiguousarray(loops, dtype=np.int32))
+    
+    starts = np.zeros(len(totals), dtype=np.int32)
+    np.cumsum(totals[:-1], out=starts[1:])
+    mesh.polygons.add(len(totals))
+    mesh.polygons.foreach_set("loop_start", starts)
+    # loop_total is derived from loop_start (read-only) since Blender 3.6
+    if not mesh.polygons.bl_rna.properties['loop_total'].is_readonly:
+        mesh.polygons.foreach_set("loop_total", np.ascontiguousarray(totals, dtype=np.int32))
+    
+    mesh.update(calc_edges=True)
+    return mesh
+
+# Human body blobs as (center, ellipsoid radii): head, torso, arms, legs
+_HUMAN_BLOBS = [
+    ((0, 0, 1.7), (0.3, 0.3, 0.35)),
+    ((0, 0, 1.0), (0.4, 0.2, 0.6)),
+    ((0.6, 0, 1.2), (0.5, 0.15, 0.15)),
+    ((-0.6, 0, 1.2), (0.5, 0.15, 0.15)),
+    ((0.2, 0, 0.0), (0.15, 0.15, 0.6)),
+    ((-0.2, 0, 0.0), (0.15, 0.15, 0.6)),
+]
+
+def _sample_blob_field(blobs, resolution: int = 64, margin: float = 0.25) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Sample a sum-of-inverse-square ellipsoid field on a regular grid"""
+    centers = np.array([center for center, _ in blobs], dtype=np.float32)
+    radii = np.array([radius for _, radius in blobs], dtype=np.float32)
+    origin = (centers - radii).min(axis=0) - margin
+    extent = (centers + radii).max(axis=0) + margin - origin
+    spacing = float(extent.max()) / (resolution - 1)
+    
+    axes = [origin[i] + spacing * np.arange(int(np.ceil(extent[i] / spacing)) + 1, dtype=np.float32)
+            for i in range(3)]
+    x, y, z = np.meshgrid(*axes, indexing='ij')
+    field = np.zeros(x.shape, dtype=np.float32)
+    for (cx, cy, cz), (rx, ry, rz) in zip(centers, radii):
+        # Each blob contributes exactly 1.0 on its own ellipsoid surface
+        field += 1.0 / (((x - cx) / rx) ** 2 + ((y - cy) / ry) ** 2 + ((z - cz) / rz) ** 2 + 1e-6)
+    return field, origin, spacing
+
+# File hashes keyed by (path, mtime, size) so unchanged files are read only once
+_FILE_HASH_CACHE: Dict[tuple, str] = {}
+
+def _fast_file_hash(path: Path) -> str:
+    """BLAKE2b of a file's contents, streamed in 1 MiB blocks"""
+    stat = os.stat(path)
+    key = (str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size)
+    if key not in _FILE_HASH_CACHE:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        _FILE_HASH_CACHE[key] = digest.hexdigest()
+    return _FILE_HASH_CACHE[key]
+
+def _generator_hash() -> str:
+    """Hash of this script, so any change to the generators invalidates the output cache"""
+    try:
+        return _fast_file_hash(Path(__file__))
+    except (NameError, OSError):
+        # Run from a Blender text block without a file on disk
+        return "unversioned"
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Hardlink src to dst, copying when they are on different filesystems"""
+    # Unlink first: rewriting a hardlinked file in place would change every other link too
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def _world_bbox(objs) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """World-space (min, max) corners of all mesh objects, or None if there are no vertices"""
+    mins, maxs = [], []
+    for obj in objs:
+        if obj.type != 'MESH' or not obj.data.vertices:
+            continue
+        n = len(obj.data.vertices)
+        co = np.empty(n * 3, dtype=np.float32)
+        obj.data.vertices.foreach_get("co", co)
+        m = np.array(obj.matrix_world, dtype=np.float32)
+        world = co.reshape(n, 3) @ m[:3, :3].T + m[:3, 3]
+        # Reduce per object so the combined bounds never need a concatenated copy
+        mins.append(world.min(axis=0))
+        maxs.append(world.max(axis=0))
+    
+    if not mins:
+        return None
+    return np.min(mins, axis=0), np.max(maxs, axis=0)
+
+def _apply_sword_details_bmesh(mesh: bpy.types.Mesh, style: str) -> None:
+    """Bake subdivision and edge bevels into a sword mesh in a single bmesh session"""
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    bmesh.ops.subdivide_edges(bm, edges=bm.edges[:], cuts=1 if style == 'short' else 2, use_grid_fill=True)
+    
+    # Bevel only sharp edges, like the bevel modifier's default 30 degree angle limit
+    sharp_edges = [edge for edge in bm.edges if edge.calc_face_angle(0.0) > math.radians(30)]
+    bmesh.ops.bevel(bm, geom=sharp_edges, offset=0.005 if style == 'short' else 0.01,
+                    segments=2, profile=0.5, affect='EDGES', clamp_overlap=True, loop_slide=True)
+    
+    bm.to_mesh(mesh)
+    bm.free()
+
+def _load_image(path: Path) -> bpy.types.Image:
+    """Return the image data-block for a file, loading it only if it is not in memory yet"""
+    path = Path(path)
+    img = bpy.data.images.get(path.name)
+    if img is not None and img.filepath and Path(bpy.path.abspath(img.filepath)).resolve() == path.resolve():
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Reused image %s", img.name)
+        return img
+    # check_existing also finds the file when it was loaded under another data-block name
+    return bpy.data.images.load(str(path), check_existing=True)
+
+def _enable_gpu_rendering(scene) -> bool:
+    """Point Cycles at the first available GPU backend, returning False if there is none"""
+    try:
+        prefs = bpy.context.preferences.addons['cycles'].preferences
+    except KeyError:
+        return False
+    
+    for device_type in GPU_DEVICE_TYPES:
+        try:
+            prefs.compute_device_type = device_type
+        except TypeError:
+            continue
+        # get_devices() must run before the device list is populated
+        prefs.get_devices()
+        gpus = [device for device in prefs.devices if device.type == device_type]
+        if gpus:
+            for device in prefs.devices:
+                device.use = device.type == device_type
+            scene.cycles.device = 'GPU'
+            logger.info("Cycles rendering on %s: %s", device_type, ', '.join(d.name for d in gpus))
+            return True
+    
+    scene.cycles.device = 'CPU'
+    return False
+
+def _set_tile_size(scene, tile_size: int = 2048) -> None:
+    """Use large power-of-two tiles on the GPU so kernel launches stay saturated"""
+    gpu = scene.cycles.device == 'GPU'
+    if hasattr(scene.cycles, 'tile_size'):
+        # Blender 3.0+ replaced tile_x/tile_y with one tile_size used by auto tiling
+        if gpu:
+            scene.cycles.tile_size = tile_size
+    else:
+        scene.render.tile_x = scene.render.tile_y = 256 if gpu else 32
+
+def _eevee_engine_id() -> str:
+    """Render engine identifier of EEVEE in the running Blender"""
+    # EEVEE Next shipped as a separate identifier from 4.2 until 5.0 renamed it back
+    return 'BLENDER_EEVEE_NEXT' if (4, 2) <= bpy.app.version < (5, 0) else 'BLENDER_EEVEE'
+
+class _KeywordClassifier:
+    """Map text to the first matching category using one precompiled regex pass"""
+    
+    def __init__(self, categories: Dict[str, List[str]]):
+        self.priority = tuple(categories)
+        alternatives = "|".join(f"(?P<{category}>{'|'.join(map(re.escape, words))})"
+                                for category, words in categories.items())
+        # Zero-width lookahead reports overlapping keywords, matching plain substring checks
+        self.regex = re.compile(f"(?=(?:{alternatives}))", re.IGNORECASE)
+    
+    def classify(self, text: str, default: Optional[str] = None) -> Optional[str]:
+        found = {match.lastgroup for match in self.regex.finditer(text)}
+        return next((category for category in self.priority if category in found), default)
+
+# Prompt classifiers, categories listed in priority order
+_REFERENCE_TYPES = _KeywordClassifier({
+    'sword': ['sword', 'blade', 'katana', 'dagger', 'greatsword'],
+    'character': ['human', 'character', 'warrior', 'mage'],
+    'building': ['castle', 'building', 'tower', 'house'],
+})
+_SWORD_VARIANTS = _KeywordClassifier({
+    'katana': ['katana'],
+    'dagger': ['dagger'],
+    'greatsword': ['greatsword'],
+})
+_PROCEDURAL_TYPES = _KeywordClassifier({
+    'sword': ['sword', 'blade', 'weapon'],
+    'human': ['human', 'person', 'character', 'man', 'woman'],
+    'creature': ['goblin', 'orc', 'monster', 'creature'],
+    'building': ['building', 'house', 'castle', 'tower'],
+})
+_GENERIC_SHAPES = _KeywordClassifier({
+    'box': ['box', 'cube', 'container'],
+    'ball': ['ball', 'sphere', 'orb'],
+    'tree': ['tree', 'plant'],
+})
+_SWORD_EFFECTS = _KeywordClassifier({
+    'flame': ['flame', 'fire', 'burning'],
+})
+_MATERIAL_TYPES = _KeywordClassifier({
+    'metal': ['metal', 'steel', 'iron', 'sword'],
+    'wood': ['wood', 'tree', 'bark'],
+    'skin': ['skin', 'flesh', 'human', 'creature'],
+    'stone': ['stone', 'rock', 'castle', 'building'],
+})
+
 class SmartBlendAI:
     """AI-Powered 3D Model Generation and Processing"""
     
-    def __init__(self, output_dir: str = "/tmp/blendai_output"):
+    # Reference analysis tables: sword variants, then the other object types
+    SWORD_TABLE = {
+        'katana': {'proportions': {'width': 0.08, 'height': 0.05, 'depth': 2.5}, 'style': 'curved',
+                   'features': ('curved_blade', 'long_handle', 'guard')},
+        'dagger': {'proportions': {'width': 0.12, 'height': 0.06, 'depth': 0.8}, 'style': 'short',
+                   'features': ('short_blade', 'small_guard')},
+        'greatsword': {'proportions': {'width': 0.15, 'height': 0.08, 'depth': 3.5}, 'style': 'large',
+                       'features': ('long_blade', 'large_guard', 'long_handle')},
+        'standard': {'proportions': {'width': 0.1, 'height': 0.05, 'depth': 1.8}, 'style': 'standard',
+                     'features': ('blade', 'guard', 'handle')},
+    }
+    CHARACTER_TABLE = {'proportions': {'width': 0.6, 'height': 1.8, 'depth': 0.3}}
+    BUILDING_TABLE = {'proportions': {'width': 4.0, 'height': 6.0, 'depth': 4.0}}
+    OBJECT_TABLES = {'character': CHARACTER_TABLE, 'building': BUILDING_TABLE}
+    
+    def __init__(self, output_dir: str = "/tmp/blendai_output", use_semantic_cache: bool = False,
+                 use_disk_cache: bool = True, use_gpu: bool = True, tile_size: int = 2048):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.temp_dir = Path(tempfile.mkdtemp(prefix="blendai_"))
+        # Intermediate files go to tmpfs when available to skip disk writeback
+        shm = Path("/dev/shm")
+        temp_base = shm if shm.is_dir() and os.access(shm, os.W_OK) else Path(tempfile.gettempdir())
+        # Removed on garbage collection or interpreter exit, so tmpfs does not fill up across processes
+        self._temp_dir_handle = tempfile.TemporaryDirectory(prefix="blendai_", dir=str(temp_base))
+        self.temp_dir = Path(self._temp_dir_handle.name)
         self.imported_objects: List[bpy.types.Object] = []
         self.reference_image_path: Optional[Path] = None
         self.reference_plane: Optional[bpy.types.Object] = None
+        # Every result file generate_and_process has written, in order
+        self.written_files: List[Path] = []
+        self.use_gpu = use_gpu
+        self.tile_size = tile_size
+        
+        # Prompt cache: sha256(mode + prompt) -> (embedding, cached fbx, output name, mode)
+        self.use_semantic_cache = use_semantic_cache
+        self._st_model = None
+        self._embed_cache: Dict[str, np.ndarray] = {}
+        self._semantic_cache: OrderedDict = OrderedDict()
+        self._semantic_matrix: Optional[Tuple[list, np.ndarray]] = None
+        self._material_templates: Dict[str, bpy.types.Material] = {}
+        self._ref_material: Optional[bpy.types.Material] = None
+        # Finished sword geometry per (style, features, proportions), copied on reuse
+        self._sword_meshes: Dict[tuple, str] = {}
+        
+        # Persistent output cache: output_dir/.cache/<content hash>/<output name>
+        self.use_disk_cache = use_disk_cache
+        self.cache_dir = self.output_dir / ".cache"
+        
+        # Generated objects live in a dedicated collection so each run can clear it cheaply
+        scene = bpy.context.scene
+        self._workspace_coll = bpy.data.collections.get(WORKSPACE_COLLECTION)
+        if self._workspace_coll is None:
+            self._workspace_coll = bpy.data.collections.new(WORKSPACE_COLLECTION)
+        if self._workspace_coll.name not in scene.collection.children:
+            scene.collection.children.link(self._workspace_coll)
+        # Make it the active collection so operator-created objects (camera, light, imports) land in it
+        view_layer = bpy.context.view_layer
+        view_layer.active_layer_collection = view_layer.layer_collection.children[self._workspace_coll.name]
+        # Drop the startup scene contents once, as the first generation used to
+        bpy.data.batch_remove(ids=list(scene.objects))
+        
+        # Keep Cycles' scene sync (BVH, textures, compiled shaders) between renders so
+        # later prompts in a batch only re-upload the meshes swapped into the workspace
+        scene.render.use_persistent_data = True
+        
+        # Enumerate render devices once; every preview reuses the result
+        self._gpu_available = use_gpu and _enable_gpu_rendering(scene)
+        
+    def _add_primitive(self, name: str, primitive: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                       scale=(1, 1, 1), location=(0, 0, 0), rotation=None) -> bpy.types.Object:
+        """Create an unlinked primitive mesh object directly through bpy.data (no operator overhead)"""
+        mesh = _build_mesh_fast(name, *_transform_primitive(primitive, scale, location, rotation))
+        return bpy.data.objects.new(name, mesh)
+    
+    def _reset_workspace(self) -> None:
+        """Remove everything the previous generation left in the workspace collection"""
+        objects = list(self._workspace_coll.all_objects)
+        # Free object data (meshes, metaballs, cameras, lights) only used by these objects
+        data = {obj.data for obj in objects if obj.data is not None and obj.data.users == 1}
+        bpy.data.batch_remove(ids=objects + list(data))
+    
+    def _join_meshes(self, parts: List[bpy.types.Object], name: str) -> bpy.types.Object:
+        """Merge mesh objects into one new unlinked object at the bmesh level (replaces bpy.ops.object.join)"""
+        bm = bmesh.new()
+        for part in parts:
+            # Bake the part transform; matrix_basis is current even before a depsgraph update
+            part.data.transform(part.matrix_basis)
+            bm.from_mesh(part.data)
+        mesh = bpy.data.meshes.new(name)
+        bm.to_mesh(mesh)
+        bm.free()
+        
+        # Remove source parts together with their now unused meshes
+        for part in parts:
+            part_mesh = part.data
+            bpy.data.objects.remove(part, do_unlink=True)
+            if part_mesh.users == 0:
+                bpy.data.meshes.remove(part_mesh)
+        
+        return bpy.data.objects.new(name, mesh)
+    
+    def _export_model(self, obj: bpy.types.Object, filename: str) -> str:
+        """Link the finished model, evaluate the depsgraph once and export it as FBX"""
+        # Parts are built unlinked, so the view layer only sees the final object
+        if obj.name not in self._workspace_coll.objects:
+            self._workspace_coll.objects.link(obj)
+        obj.select_set(True)
+        bpy.context.view_layer.objects.active = obj
+        bpy.context.view_layer.update()
+        
+        output_path = self.output_dir / filename
+        # Never rewrite a file that may be hardlinked into the output cache
+        output_path.unlink(missing_ok=True)
+        bpy.ops.export_scene.fbx(filepath=str(output_path), use_selection=True)
         
+        self.imported_objects = [obj]
+        return str(output_path)
+    
     def generate_model_from_text(self, prompt: str, model_type: str = "auto", reference_image: Optional[str] = None) -> Optional[str]:
         """Generate 3D model from text description using various AI methods"""
-        logger.info(f"Generating 3D model from prompt: '{prompt}'")
-        
-        # Store reference image if provided
-        if reference_image and Path(reference_image).exists():
-            self.reference_image_path = Path(reference_image)
-            logger.info(f"Using reference image: {reference_image}")
-        
-        # Try different generation methods
-        methods = [
-            self._generate_with_reference_analysis,
-            self._generate_with_procedural,
-            self._generate_basic_primitive
-        ]
+        logger.info("Generating 3D model from prompt: '%s'", prompt)
+        
+        # Store this call's reference image; clear any left over from an earlier prompt in the batch
+        self.reference_image_path = Path(reference_image) if reference_image and Path(reference_image).exists() else None
+        self.reference_plane = None
+        if self.reference_image_path:
+            logger.info("Using reference image: %s", reference_image)
+        
+        # Reuse a previous output whose scene content hash matches
+        content_key = self._content_cache_key(prompt, model_type) if self.use_disk_cache else None
+        cached = self._lookup_disk_cache(content_key) if content_key else None
+        
+        # Otherwise reuse a cached model for identical or semantically similar prompts
+        mode = (model_type, self.reference_image_path is not None)
+        cache_key = hashlib.sha256(f"{mode}\0{prompt}".encode()).digest()
+        if not cached:
+            cached = self._lookup_model_cache(cache_key, prompt, mode)
+        if cached:
+            result = self._load_cached_model(*cached)
+            if result:
+                if self.reference_image_path:
+                    self._setup_reference_image()
+                return result
+        
+        # Try different generation methods, skipping reference analysis without an image
+        methods = []
+        if self.reference_image_path:
+            methods.append(self._generate_with_reference_analysis)
+        methods.append(self._generate_with_procedural)
         
         for method in methods:
             try:
                 result = method(prompt, model_type)
                 if result:
-                    logger.info(f"Successfully generated model using {method.__name__}")
+                    logger.info("Successfully generated model using %s", method.__name__)
+                    self._store_model_cache(cache_key, prompt, mode, Path(result))
+                    if content_key:
+                        self._store_disk_cache(content_key, Path(result))
                     # Add reference image to scene if provided
                     if self.reference_image_path:
                         self._setup_reference_image()
                     return result
             except Exception as e:
-                logger.warning(f"Method {method.__name__} failed: {e}")
+                logger.warning("Method %s failed: %s", method.__name__, e)
                 continue
         
         logger.error("All generation methods failed")
         return None
     
+    def _get_embedding_model(self):
+        """Load the sentence-transformer on first use; None disables semantic matching"""
+        if self._st_model is None and self.use_semantic_cache and SentenceTransformer is not None:
+            try:
+                self._st_model = SentenceTransformer(EMBEDDING_MODEL)
+            except Exception as e:
+                logger.warning("Semantic cache disabled, embedding model unavailable: %s", e)
+                self.use_semantic_cache = False
+        return self._st_model
+    
+    def _embed_batch(self, prompts: List[str]) -> Optional[np.ndarray]:
+        """Embed prompts as unit vectors, encoding every uncached prompt in one model call"""
+        keys = [hashlib.sha256(prompt.encode()).hexdigest() for prompt in prompts]
+        missing = {key: prompt for key, prompt in zip(keys, prompts) if key not in self._embed_cache}
+        
+        if missing:
+            model = self._get_embedding_model()
+            if model is None:
+                return None
+            vectors = model.encode(list(missing.values()), batch_size=EMBEDDING_BATCH_SIZE,
+                                   normalize_embeddings=True, convert_to_numpy=True)
+            self._embed_cache.update(zip(missing, vectors))
+            while len(self._embed_cache) > SEMANTIC_CACHE_SIZE:
+                del self._embed_cache[next(iter(self._embed_cache))]
+        
+        return np.stack([self._embed_cache[key] for key in keys])
+    
+    def _prompt_embedding(self, prompt: str) -> Optional[np.ndarray]:
+        """Embed a single prompt, memoized by its SHA-256"""
+        embeddings = self._embed_batch([prompt])
+        return None if embeddings is None else embeddings[0]
+    
+    def prepare_prompts(self, prompts: List[str]) -> None:
+        """Pre-embed a queue of prompts so each cache lookup in a batch run is a dictionary hit"""
+        if self.use_semantic_cache and prompts:
+            self._embed_batch(list(dict.fromkeys(prompts)))
+    
+    def _lookup_model_cache(self, cache_key: bytes, prompt: str, mode: tuple) -> Optional[Tuple[Path, str]]:
+        """Find a cached model for this prompt: exact hash first, then cosine similarity"""
+        if not self.use_semantic_cache or not self._semantic_cache:
+            return None
+        
+        if cache_key not in self._semantic_cache:
+            embedding = self._prompt_embedding(prompt)
+            if embedding is None:
+                return None
+            
+            # Stack cached embeddings into one matrix, rebuilt only after the cache changes
+            if self._semantic_matrix is None:
+                keys = [k for k, entry in self._semantic_cache.items() if entry[0] is not None]
+                if not keys:
+                    return None
+                self._semantic_matrix = (keys, np.stack([self._semantic_cache[k][0] for k in keys]))
+            keys, matrix = self._semantic_matrix
+            
+            # Embeddings are unit length, so cosine similarity is a single matvec
+            similarity = matrix @ embedding
+            for i in np.argsort(similarity)[::-1]:
+                if similarity[i] < SEMANTIC_CACHE_THRESHOLD:
+                    return None
+                if self._semantic_cache[keys[i]][3] == mode:
+                    cache_key = keys[i]
+                    logger.info("Semantic cache hit (similarity %.2f)", similarity[i])
+                    break
+            else:
+                return None
+        
+        self._semantic_cache.move_to_end(cache_key)
+        _, cached_file, output_name, _ = self._semantic_cache[cache_key]
+        return (cached_file, output_name) if cached_file.exists() else None
+    
+    def _store_model_cache(self, cache_key: bytes, prompt: str, mode: tuple, result_path: Path) -> None:
+        """Keep a private copy of a generated model so later outputs cannot overwrite it"""
+        if not self.use_semantic_cache or not result_path.exists():
+            return
+        
+        cache_dir = self.temp_dir / "model_cache"
+        cache_dir.mkdir(exist_ok=True)
+        cached_file = cache_dir / f"{cache_key.hex()}{result_path.suffix}"
+        _link_or_copy(result_path, cached_file)
+        
+        self._semantic_cache[cache_key] = (self._prompt_embedding(prompt), cached_file, result_path.name, mode)
+        self._semantic_cache.move_to_end(cache_key)
+        while len(self._semantic_cache) > SEMANTIC_CACHE_SIZE:
+            _, evicted = self._semantic_cache.popitem(last=False)
+            evicted[1].unlink(missing_ok=True)
+        self._semantic_matrix = None
+    
+    def _content_cache_key(self, prompt: str, model_type: str) -> str:
+        """Hash everything that determines the generated scene: generator code, prompt, analysis and image"""
+        image_hash = _fast_file_hash(self.reference_image_path) if self.reference_image_path else None
+        # The environment matters too: marching cubes and the Blender version change the geometry
+        payload = {'v': _generator_hash(), 'mc': marching_cubes is not None, 'bl': list(bpy.app.version),
+                   'p': prompt, 't': model_type, 'a': self._analyze_reference_image(prompt), 'img': image_hash}
+        return hashlib.blake2b(json.dumps(payload, sort_keys=True).encode(), digest_size=16).hexdigest()
+    
+    def _lookup_disk_cache(self, content_key: str) -> Optional[Tuple[Path, str]]:
+        """Find an output from an earlier run with the same content hash"""
+        entry_dir = self.cache_dir / content_key
+        cached_files = list(entry_dir.glob("*.fbx")) if entry_dir.is_dir() else []
+        if not cached_files:
+            return None
+        logger.info("Output cache hit: %s", content_key)
+        # Entry mtime tracks last use for eviction
+        try:
+            os.utime(entry_dir)
+        except OSError:
+            pass
+        return cached_files[0], cached_files[0].name
+    
+    def _store_disk_cache(self, content_key: str, result_path: Path) -> None:
+        """Hardlink a fresh output into the persistent cache"""
+        try:
+            entry_dir = self.cache_dir / content_key
+            entry_dir.mkdir(parents=True, exist_ok=True)
+            _link_or_copy(result_path, entry_dir / result_path.name)
+            self._evict_disk_cache()
+        except OSError as e:
+            logger.warning("Could not cache output %s: %s", result_path, e)
+    
+    def _evict_disk_cache(self) -> None:
+        """Drop the least recently used entries once the cache exceeds DISK_CACHE_MAX_ENTRIES"""
+        entries = [entry for entry in self.cache_dir.iterdir() if entry.is_dir()]
+        excess = len(entries) - DISK_CACHE_MAX_ENTRIES
+        if excess <= 0:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:excess]:
+            # Removing the entry also releases old output inodes it kept alive through hardlinks
+            shutil.rmtree(entry, ignore_errors=True)
+        logger.info("Evicted %s output cache entries", excess)
+    
+    def _load_cached_model(self, cached_file: Path, output_name: str) -> Optional[str]:
+        """Copy a cached model to the output directory and import it instead of regenerating"""
+        try:
+            output_path = self.output_dir / output_name
+            _link_or_copy(cached_file, output_path)
+            
+            # Clear scene
+            self._reset_workspace()
+            
+            bpy.ops.import_scene.fbx(filepath=str(output_path))
+            # The scene was empty, so everything in it came from the cached model
+            self.imported_objects = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
+            
+            logger.info("Reused cached model: %s", output_path)
+            return str(output_path)
+        except Exception as e:
+            logger.warning("Cached model could not be loaded, regenerating: %s", e)
+            return None
+    
     def _generate_with_reference_analysis(self, prompt: str, model_type: str) -> Optional[str]:
         """Generate using reference image analysis for better accuracy"""
         if not self.reference_image_path:
             return None
             
-        logger.info(f"Analyzing reference image: {self.reference_image_path}")
+        logger.info("Analyzing reference image: %s", self.reference_image_path)
         
         # Analyze the reference image to extract information
         analysis = self._analyze_reference_image(prompt)
@@ -92,50 +714,26 @@ class SmartBlendAI:
         """Analyze reference image to extract proportions and features"""
         logger.info("Analyzing reference image for proportions and features")
         
-        # Basic analysis based on prompt and image presence
+        # Determine object type from prompt, then look up its proportions and features
+        object_type = _REFERENCE_TYPES.classify(prompt, 'generic')
+        if object_type == 'sword':
+            entry = self.SWORD_TABLE[_SWORD_VARIANTS.classify(prompt, 'standard')]
+        else:
+            entry = self.OBJECT_TABLES.get(object_type, {})
+        
         analysis = {
-            'type': 'generic',
-            'proportions': {'width': 1.0, 'height': 1.0, 'depth': 1.0},
-            'style': 'basic',
-            'features': []
+            'type': object_type,
+            'proportions': dict(entry.get('proportions', {'width': 1.0, 'height': 1.0, 'depth': 1.0})),
+            'style': entry.get('style', 'basic'),
+            'features': list(entry.get('features', ()))
         }
         
-        prompt_lower = prompt.lower()
-        
-        # Determine object type from prompt
-        if any(word in prompt_lower for word in ['sword', 'blade', 'katana', 'dagger', 'greatsword']):
-            analysis['type'] = 'sword'
-            if 'katana' in prompt_lower:
-                analysis['proportions'] = {'width': 0.08, 'height': 0.05, 'depth': 2.5}
-                analysis['style'] = 'curved'
-                analysis['features'] = ['curved_blade', 'long_handle', 'guard']
-            elif 'dagger' in prompt_lower:
-                analysis['proportions'] = {'width': 0.12, 'height': 0.06, 'depth': 0.8}
-                analysis['style'] = 'short'
-                analysis['features'] = ['short_blade', 'small_guard']
-            elif 'greatsword' in prompt_lower:
-                analysis['proportions'] = {'width': 0.15, 'height': 0.08, 'depth': 3.5}
-                analysis['style'] = 'large'
-                analysis['features'] = ['long_blade', 'large_guard', 'long_handle']
-            else:
-                analysis['proportions'] = {'width': 0.1, 'height': 0.05, 'depth': 1.8}
-                analysis['style'] = 'standard'
-                analysis['features'] = ['blade', 'guard', 'handle']
-                
-        elif any(word in prompt_lower for word in ['human', 'character', 'warrior', 'mage']):
-            analysis['type'] = 'character'
-            analysis['proportions'] = {'width': 0.6, 'height': 1.8, 'depth': 0.3}
-            
-        elif any(word in prompt_lower for word in ['castle', 'building', 'tower', 'house']):
-            analysis['type'] = 'building'
-            analysis['proportions'] = {'width': 4.0, 'height': 6.0, 'depth': 4.0}
-        
-        logger.info(f"Analysis result: {analysis}")
+        logger.info("Analysis result: %s", analysis)
         return analysis
     
     def _create_procedural_sword(self, prompt: str) -> str:
         """Create a procedural sword based on prompt analysis"""
-        logger.info(f"Creating procedural sword from prompt: {prompt}")
+        logger.info("Creating procedural sword from prompt: %s", prompt)
         
         # Analyze prompt for sword type
         analysis = self._analyze_reference_image(prompt)
@@ -145,107 +743,102 @@ class SmartBlendAI:
     
     def _generate_with_procedural(self, prompt: str, model_type: str) -> Optional[str]:
         """Generate using procedural modeling based on text analysis"""
-        logger.info(f"Generating procedural model for: {prompt}")
+        logger.info("Generating procedural model for: %s", prompt)
         
         # Analyze prompt to determine what to create
-        prompt_lower = prompt.lower()
+        builders = {
+            'sword': self._create_procedural_sword,
+            'human': self._create_procedural_human,
+            'creature': self._create_procedural_creature,
+            'building': self._create_procedural_building,
+        }
+        builder = builders.get(_PROCEDURAL_TYPES.classify(prompt))
         
-        if any(word in prompt_lower for word in ['sword', 'blade', 'weapon']):
-            return self._create_procedural_sword(prompt)
-        elif any(word in prompt_lower for word in ['human', 'person', 'character', 'man', 'woman']):
-            return self._create_procedural_human(prompt)
-        elif any(word in prompt_lower for word in ['goblin', 'orc', 'monster', 'creature']):
-            return self._create_procedural_creature(prompt)
-        elif any(word in prompt_lower for word in ['building', 'house', 'castle', 'tower']):
-            return self._create_procedural_building(prompt)
-        else:
-            return self._create_procedural_generic(prompt)
+        if builder:
+            try:
+                result = builder(prompt)
+                if result:
+                    return result
+            except Exception as e:
+                logger.warning("Method %s failed: %s", builder.__name__, e)
+            logger.info("Using basic primitive generation as fallback")
+        
+        return self._create_procedural_generic(prompt)
     
     def _create_reference_guided_sword(self, prompt: str, analysis: Dict) -> str:
         """Create a sword based on reference image analysis"""
-        logger.info(f"Creating reference-guided sword: {analysis['style']}")
+        logger.info("Creating reference-guided sword: %s", analysis['style'])
         
         # Clear scene
-        bpy.ops.object.select_all(action='SELECT')
-        bpy.ops.object.delete()
+        self._reset_workspace()
         
         props = analysis['proportions']
         style = analysis['style']
         features = analysis['features']
         
-        # Create blade with reference-guided proportions
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, 0))
-        blade = bpy.context.active_object
-        blade.name = "Sword_Blade"
-        blade.scale = (props['width'], props['height'], props['depth'])
+        name = f"Generated_{style.title()}_Sword"
+        
+        # Same analysis always yields the same geometry, so build it once and copy it
+        key = (style, tuple(features), tuple(sorted(props.items())))
+        template = bpy.data.meshes.get(self._sword_meshes.get(key, ""))
+        if template is None:
+            template = self._build_sword_mesh(f"{name}_Template", props, style)
+            self._sword_meshes[key] = template.name
+        
+        mesh = template.copy()
+        mesh.name = name
+        sword = bpy.data.objects.new(name, mesh)
         
         # Apply style-specific modifications
         if style == 'curved' and 'curved_blade' in features:
             # Add curve to katana
-            mod_simple_deform = blade.modifiers.new(name="Curve", type='SIMPLE_DEFORM')
+            mod_simple_deform = sword.modifiers.new(name="Curve", type='SIMPLE_DEFORM')
             mod_simple_deform.deform_method = 'BEND'
             mod_simple_deform.angle = 0.1  # Slight curve
             mod_simple_deform.deform_axis = 'Z'
         
+        # Add reference-specific details
+        self._add_reference_sword_details(sword, prompt, analysis)
+        
+        # Export as FBX
+        return self._export_model(sword, f"generated_{style}_sword.fbx")
+    
+    def _build_sword_mesh(self, name: str, props: Dict, style: str) -> bpy.types.Mesh:
+        """Build the detailed sword mesh for one set of reference proportions"""
+        # Create blade with reference-guided proportions
+        blade = _transform_primitive(_UNIT_CUBE, scale=(props['width'], props['height'], props['depth']))
+        
         # Create guard proportional to blade
         guard_scale = 0.3 if style == 'short' else 0.4 if style == 'large' else 0.35
         guard_z = -props['depth'] * 0.6
-        
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, guard_z))
-        guard = bpy.context.active_object
-        guard.name = "Sword_Guard"
-        guard.scale = (guard_scale, props['height'], props['height'] * 2)
+        guard = _transform_primitive(_UNIT_CUBE, scale=(guard_scale, props['height'], props['height'] * 2),
+                                     location=(0, 0, guard_z))
         
         # Create handle proportional to sword type
         handle_length = 0.8 if style == 'large' else 0.4 if style == 'short' else 0.6
         handle_z = guard_z - handle_length/2
-        
-        bpy.ops.mesh.primitive_cylinder_add(radius=props['width']*0.8, depth=handle_length, location=(0, 0, handle_z))
-        handle = bpy.context.active_object
-        handle.name = "Sword_Handle"
+        handle_radius = props['width'] * 0.8
+        handle = _transform_primitive(_UNIT_CYLINDER, scale=(handle_radius, handle_radius, handle_length / 2),
+                                      location=(0, 0, handle_z))
         
         # Create pommel
         pommel_z = handle_z - handle_length/2 - 0.1
-        bpy.ops.mesh.primitive_uv_sphere_add(radius=props['width']*1.2, location=(0, 0, pommel_z))
-        pommel = bpy.context.active_object
-        pommel.name = "Sword_Pommel"
+        pommel_radius = props['width'] * 1.2
+        pommel = _transform_primitive(_UNIT_UV_SPHERE, scale=(pommel_radius,) * 3, location=(0, 0, pommel_z))
         
-        # Join all parts
-        bpy.ops.object.select_all(action='DESELECT')
-        blade.select_set(True)
-        guard.select_set(True)
-        handle.select_set(True)
-        pommel.select_set(True)
-        bpy.context.view_layer.objects.active = blade
-        bpy.ops.object.join()
+        # All parts share one vertex buffer, so no join pass is needed
+        mesh = _build_mesh_fast(name, *_concat_primitives([blade, guard, handle, pommel]))
         
-        sword = bpy.context.active_object
-        sword.name = f"Generated_{style.title()}_Sword"
-        
-        # Add reference-specific details
-        self._add_reference_sword_details(sword, prompt, analysis)
-        
-        # Export as FBX
-        output_path = self.output_dir / f"generated_{style}_sword.fbx"
-        bpy.ops.export_scene.fbx(filepath=str(output_path), use_selection=True)
-        
-        self.imported_objects = [sword]
-        return str(output_path)
+        # Subdivide and bevel the mesh directly instead of stacking modifiers
+        _apply_sword_details_bmesh(mesh, style)
+        # No fake user: a zero-user template stays in bpy.data for the session without being
+        # written into every saved .blend
+        return mesh
     
     def _add_reference_sword_details(self, sword_obj: bpy.types.Object, prompt: str, analysis: Dict):
         """Add details based on reference analysis"""
-        prompt_lower = prompt.lower()
         style = analysis['style']
         
-        # Add subdivision for smoother look
-        mod_subsurf = sword_obj.modifiers.new(name="Subdivision", type='SUBSURF')
-        mod_subsurf.levels = 1 if style == 'short' else 2
-        
-        # Add bevels for realistic edges
-        mod_bevel = sword_obj.modifiers.new(name="Bevel", type='BEVEL')
-        mod_bevel.width = 0.005 if style == 'short' else 0.01
-        mod_bevel.segments = 2
-        
         # Style-specific modifications
         if style == 'curved':
             # Katana-specific details - skip wave modifier for compatibility
@@ -258,7 +851,7 @@ class SmartBlendAI:
             mod_array.thickness = -0.01
             
         # Special effects based on prompt
-        if any(word in prompt_lower for word in ['flame', 'fire', 'burning']):
+        if _SWORD_EFFECTS.classify(prompt) == 'flame':
             mod_displace = sword_obj.modifiers.new(name="Flame_Effect", type='DISPLACE')
             mod_displace.strength = 0.02
     
@@ -267,9 +860,35 @@ class SmartBlendAI:
         logger.info("Creating procedural human")
         
         # Clear scene
-        bpy.ops.object.select_all(action='SELECT')
-        bpy.ops.object.delete()
+        self._reset_workspace()
         
+        if marching_cubes is not None:
+            human = self._create_sampled_human()
+        else:
+            human = self._create_metaball_human()
+        human.name = "Generated_Human"
+        
+        # Export as FBX
+        return self._export_model(human, "generated_human.fbx")
+    
+    def _create_sampled_human(self) -> bpy.types.Object:
+        """Build the human from a NumPy-sampled implicit surface and marching cubes"""
+        field, origin, spacing = _sample_blob_field(_HUMAN_BLOBS)
+        verts, faces, _, _ = marching_cubes(field, level=1.0, spacing=(spacing,) * 3)
+        verts = (verts + origin).astype(np.float32)
+        
+        # Orient faces outward (positive signed volume)
+        tris = verts[faces]
+        if np.einsum('ij,ij->', tris[:, 0], np.cross(tris[:, 1], tris[:, 2])) < 0:
+            faces = faces[:, ::-1]
+        
+        mesh = _build_mesh_fast("Generated_Human", verts, faces.ravel(), np.full(len(faces), 3, dtype=np.int32))
+        # Dense enough for export; smooth shading replaces the subdivision modifier
+        mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), dtype=bool))
+        return bpy.data.objects.new("Generated_Human", mesh)
+    
+    def _create_metaball_human(self) -> bpy.types.Object:
+        """Fallback human from metaballs when scikit-image is not installed"""
         # Create basic human using meta balls for organic shape
         bpy.ops.object.metaball_add(type='BALL', location=(0, 0, 0))
         head = bpy.context.active_object
@@ -308,18 +927,11 @@ class SmartBlendAI:
         bpy.ops.object.join()
         
         human = bpy.context.active_object
-        human.name = "Generated_Human"
         
         # Add subdivision for smoother look
         mod_subsurf = human.modifiers.new(name="Subdivision", type='SUBSURF')
         mod_subsurf.levels = 2
-        
-        # Export as FBX
-        output_path = self.output_dir / "generated_human.fbx"
-        bpy.ops.export_scene.fbx(filepath=str(output_path), use_selection=True)
-        
-        self.imported_objects = [human]
-        return str(output_path)
+        return human
     
     def _setup_reference_image(self) -> bool:
         """Setup reference image in the scene"""
@@ -327,31 +939,15 @@ class SmartBlendAI:
             return False
             
         try:
-            logger.info(f"Setting up reference image: {self.reference_image_path}")
+            logger.info("Setting up reference image: %s", self.reference_image_path)
             
             # Create a plane for the reference image
             bpy.ops.mesh.primitive_plane_add(size=3, location=(5, 0, 0))
             self.reference_plane = bpy.context.active_object
             self.reference_plane.name = "Reference_Image"
             
-            # Create material for the image
-            mat = bpy.data.materials.new(name="Reference_Material")
-            mat.use_nodes = True
-            nodes = mat.node_tree.nodes
-            nodes.clear()
-            
-            # Create nodes
-            output = nodes.new('ShaderNodeOutputMaterial')
-            principled = nodes.new('ShaderNodeBsdfPrincipled')
-            tex_image = nodes.new('ShaderNodeTexImage')
-            
-            # Load the reference image
-            img = bpy.data.images.load(str(self.reference_image_path))
-            tex_image.image = img
-            
-            # Link nodes
-            mat.node_tree.links.new(tex_image.outputs['Color'], principled.inputs['Base Color'])
-            mat.node_tree.links.new(principled.outputs['BSDF'], output.inputs['Surface'])
+            # Reuse the reference material with this image
+            mat = self._get_reference_material(_load_image(self.reference_image_path))
             
             # Assign material to plane
             self.reference_plane.data.materials.append(mat)
@@ -363,9 +959,39 @@ class SmartBlendAI:
             return True
             
         except Exception as e:
-            logger.error(f"Failed to setup reference image: {e}")
+            logger.error("Failed to setup reference image: %s", e)
             return False
     
+    def _get_reference_material(self, image: bpy.types.Image) -> bpy.types.Material:
+        """Return the shared reference material, building its node tree only once"""
+        mat = self._ref_material
+        if mat is None or mat.name not in bpy.data.materials:
+            # Adopt a reference material an earlier run left in the file before building one
+            mat = bpy.data.materials.get("Reference_Material")
+            if mat is not None and mat.node_tree and 'RefImageTex' in mat.node_tree.nodes:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Reused material %s", mat.name)
+            else:
+                mat = bpy.data.materials.new(name="Reference_Material")
+                mat.use_nodes = True
+                nodes = mat.node_tree.nodes
+                nodes.clear()
+            
+                # Add nodes
+                output = nodes.new('ShaderNodeOutputMaterial')
+                principled = nodes.new('ShaderNodeBsdfPrincipled')
+                tex_image = nodes.new('ShaderNodeTexImage')
+                tex_image.name = 'RefImageTex'
+            
+                # Link nodes
+                mat.node_tree.links.new(tex_image.outputs['Color'], principled.inputs['Base Color'])
+                mat.node_tree.links.new(principled.outputs['BSDF'], output.inputs['Surface'])
+            self._ref_material = mat
+        
+        # Only the image differs between reference planes
+        mat.node_tree.nodes['RefImageTex'].image = image
+        return mat
+    
     def _position_reference_plane(self) -> None:
         """Position reference plane next to the generated model"""
         if not self.reference_plane or not self.imported_objects:
@@ -373,20 +999,10 @@ class SmartBlendAI:
             
         try:
             # Calculate bounds of generated objects
-            all_coords = []
-            for obj in self.imported_objects:
-                if obj.type == 'MESH':
-                    for vertex in obj.data.vertices:
-                        world_coord = obj.matrix_world @ vertex.co
-                        all_coords.append(world_coord)
-            
-            if all_coords:
-                min_coords = Vector((min(coord.x for coord in all_coords),
-                                   min(coord.y for coord in all_coords),
-                                   min(coord.z for coord in all_coords)))
-                max_coords = Vector((max(coord.x for coord in all_coords),
-                                   max(coord.y for coord in all_coords),
-                                   max(coord.z for coord in all_coords)))
+            bounds = _world_bbox(self.imported_objects)
+            
+            if bounds is not None:
+                min_coords, max_coords = Vector(bounds[0]), Vector(bounds[1])
                 
                 model_center = (min_coords + max_coords) / 2
                 model_size = max_coords - min_coords
@@ -400,10 +1016,10 @@ class SmartBlendAI:
                 scale_factor = max(model_size) * 0.8
                 self.reference_plane.scale = (scale_factor, scale_factor, 1)
                 
-                logger.info(f"Reference plane positioned at {self.reference_plane.location}")
+                logger.info("Reference plane positioned at %s", self.reference_plane.location)
                 
         except Exception as e:
-            logger.error(f"Failed to position reference plane: {e}")
+            logger.error("Failed to position reference plane: %s", e)
     
     def _create_reference_guided_character(self, prompt: str, analysis: Dict) -> str:
         """Create character using reference image guidance"""
@@ -464,7 +1080,7 @@ class SmartBlendAI:
         human_path = self._create_procedural_human("base creature")
         
         # Modify for creature characteristics
-        creature = bpy.context.active_object
+        creature = self.imported_objects[0]
         creature.name = "Generated_Creature"
         
         prompt_lower = prompt.lower()
@@ -476,127 +1092,100 @@ class SmartBlendAI:
             creature.location = (0, 0, -0.2)
             
             # Add pointy ears (simple geometry)
-            bpy.ops.mesh.primitive_cone_add(radius1=0.05, depth=0.15, location=(0.25, 0, 1.8))
-            ear_r = bpy.context.active_object
-            ear_r.rotation_euler = (0, 1.57, 0.5)
-            
-            bpy.ops.mesh.primitive_cone_add(radius1=0.05, depth=0.15, location=(-0.25, 0, 1.8))
-            ear_l = bpy.context.active_object
-            ear_l.rotation_euler = (0, -1.57, -0.5)
+            ear_r = self._add_primitive("Ear_R", _UNIT_CONE, scale=(0.05, 0.05, 0.075),
+                                        location=(0.25, 0, 1.8), rotation=(0, 1.57, 0.5))
+            ear_l = self._add_primitive("Ear_L", _UNIT_CONE, scale=(0.05, 0.05, 0.075),
+                                        location=(-0.25, 0, 1.8), rotation=(0, -1.57, -0.5))
             
             # Join ears to main body
-            bpy.ops.object.select_all(action='DESELECT')
-            creature.select_set(True)
-            ear_r.select_set(True)
-            ear_l.select_set(True)
-            bpy.context.view_layer.objects.active = creature
-            bpy.ops.object.join()
+            creature = self._join_meshes([creature, ear_r, ear_l], "Generated_Creature")
+            if marching_cubes is None:
+                # Only the coarse metaball body needs smoothing; the sampled one is already dense
+                mod_subsurf = creature.modifiers.new(name="Subdivision", type='SUBSURF')
+                mod_subsurf.levels = 2
         
         # Export as FBX
-        output_path = self.output_dir / "generated_creature.fbx"
-        bpy.ops.export_scene.fbx(filepath=str(output_path), use_selection=True)
-        
-        self.imported_objects = [creature]
-        return str(output_path)
+        return self._export_model(creature, "generated_creature.fbx")
     
     def _create_procedural_building(self, prompt: str) -> str:
         """Create a procedural building"""
         logger.info("Creating procedural building")
         
         # Clear scene
-        bpy.ops.object.select_all(action='SELECT')
-        bpy.ops.object.delete()
+        self._reset_workspace()
         
         prompt_lower = prompt.lower()
         
         if 'castle' in prompt_lower:
             # Create castle base
-            bpy.ops.mesh.primitive_cube_add(size=4, location=(0, 0, 1))
-            base = bpy.context.active_object
-            base.scale = (2, 2, 1)
+            parts = [self._add_primitive("Castle_Base", _UNIT_CUBE, scale=(4, 4, 2), location=(0, 0, 1))]
             
             # Add towers
             for i, pos in enumerate([(2, 2, 2.5), (-2, 2, 2.5), (2, -2, 2.5), (-2, -2, 2.5)]):
-                bpy.ops.mesh.primitive_cylinder_add(radius=0.5, depth=3, location=pos)
-                tower = bpy.context.active_object
-                tower.name = f"Tower_{i}"
+                parts.append(self._add_primitive(f"Tower_{i}", _UNIT_CYLINDER, scale=(0.5, 0.5, 1.5), location=pos))
             
             # Add main keep
-            bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, 3))
-            keep = bpy.context.active_object
-            keep.scale = (1, 1, 2)
+            parts.append(self._add_primitive("Castle_Keep", _UNIT_CUBE, scale=(1, 1, 2), location=(0, 0, 3)))
             
         else:
             # Generic building
-            bpy.ops.mesh.primitive_cube_add(size=4, location=(0, 0, 2))
-            base = bpy.context.active_object
-            base.scale = (1.5, 1, 2)
+            parts = [self._add_primitive("Building_Base", _UNIT_CUBE, scale=(3, 2, 4), location=(0, 0, 2))]
         
         # Join all parts
-        bpy.ops.object.select_all(action='SELECT')
-        bpy.ops.object.join()
-        
-        building = bpy.context.active_object
-        building.name = "Generated_Building"
+        building = self._join_meshes(parts, "Generated_Building")
         
         # Add some architectural details
         mod_bevel = building.modifiers.new(name="Bevel", type='BEVEL')
         mod_bevel.width = 0.05
         
         # Export as FBX
-        output_path = self.output_dir / "generated_building.fbx"
-        bpy.ops.export_scene.fbx(filepath=str(output_path), use_selection=True)
-        
-        self.imported_objects = [building]
-        return str(output_path)
+        return self._export_model(building, "generated_building.fbx")
     
     def _create_procedural_generic(self, prompt: str) -> str:
         """Create a generic object based on simple keywords"""
-        logger.info(f"Creating generic object for: {prompt}")
+        logger.info("Creating generic object for: %s", prompt)
         
         # Clear scene
-        bpy.ops.object.select_all(action='SELECT')
-        bpy.ops.object.delete()
+        self._reset_workspace()
         
         # Simple keyword-based generation
-        prompt_lower = prompt.lower()
+        shape = _GENERIC_SHAPES.classify(prompt)
         
-        if any(word in prompt_lower for word in ['box', 'cube', 'container']):
-            bpy.ops.mesh.primitive_cube_add(size=2)
-        elif any(word in prompt_lower for word in ['ball', 'sphere', 'orb']):
-            bpy.ops.mesh.primitive_uv_sphere_add(radius=1)
-        elif any(word in prompt_lower for word in ['tree', 'plant']):
+        if shape == 'box':
+            obj = self._add_primitive("Generated_Object", _UNIT_CUBE)
+        elif shape == 'ball':
+            obj = self._add_primitive("Generated_Object", _UNIT_UV_SPHERE)
+        elif shape == 'tree':
             # Simple tree
-            bpy.ops.mesh.primitive_cylinder_add(radius=0.1, depth=2, location=(0, 0, 1))
-            trunk = bpy.context.active_object
-            bpy.ops.mesh.primitive_uv_sphere_add(radius=0.8, location=(0, 0, 2.5))
-            leaves = bpy.context.active_object
-            leaves.scale = (1, 1, 0.6)
-            bpy.ops.object.select_all(action='SELECT')
-            bpy.ops.object.join()
+            trunk = self._add_primitive("Tree_Trunk", _UNIT_CYLINDER, scale=(0.1, 0.1, 1), location=(0, 0, 1))
+            leaves = self._add_primitive("Tree_Leaves", _UNIT_UV_SPHERE, scale=(0.8, 0.8, 0.48), location=(0, 0, 2.5))
+            obj = self._join_meshes([trunk, leaves], "Generated_Object")
         else:
             # Default to cube
-            bpy.ops.mesh.primitive_cube_add(size=2)
+            obj = self._add_primitive("Generated_Object", _UNIT_CUBE)
         
-        obj = bpy.context.active_object
         obj.name = "Generated_Object"
         
         # Export as FBX
-        output_path = self.output_dir / "generated_object.fbx"
-        bpy.ops.export_scene.fbx(filepath=str(output_path), use_selection=True)
-        
-        self.imported_objects = [obj]
-        return str(output_path)
-    
-    def _generate_basic_primitive(self, prompt: str, model_type: str) -> Optional[str]:
-        """Fallback: generate basic primitive shapes"""
-        logger.info("Using basic primitive generation as fallback")
-        return self._create_procedural_generic(prompt)
+        return self._export_model(obj, "generated_object.fbx")
     
     def create_smart_material(self, material_name: str, description: str = "") -> bpy.types.Material:
         """Create materials based on text description"""
-        logger.info(f"Creating smart material: {material_name} - {description}")
+        logger.info("Creating smart material: %s - %s", material_name, description)
         
+        # Analyze description for material properties
+        return self._build_smart_material(material_name, _MATERIAL_TYPES.classify(description, 'default'))
+    
+    def _get_material_template(self, material_type: str) -> bpy.types.Material:
+        """Return the shared material for a category, building its node tree only once"""
+        material_name = f"Smart_{material_type.title()}"
+        if material_type not in self._material_templates or material_name not in bpy.data.materials:
+            mat = self._build_smart_material(material_name, material_type)
+            self._material_templates[material_type] = mat
+        return self._material_templates[material_type]
+    
+    def _build_smart_material(self, material_name: str, material_type: str) -> bpy.types.Material:
+        """Build the node tree for a material category (metal, wood, skin, stone, default)"""
         # Remove existing material
         if material_name in bpy.data.materials:
             bpy.data.materials.remove(bpy.data.materials[material_name])
@@ -611,22 +1200,19 @@ class SmartBlendAI:
         output = nodes.new('ShaderNodeOutputMaterial')
         principled = nodes.new('ShaderNodeBsdfPrincipled')
         
-        # Analyze description for material properties
-        desc_lower = description.lower()
-        
-        if any(word in desc_lower for word in ['metal', 'steel', 'iron', 'sword']):
+        if material_type == 'metal':
             # Metallic material
             principled.inputs['Base Color'].default_value = (0.7, 0.7, 0.8, 1.0)
             principled.inputs['Metallic'].default_value = 0.9
             principled.inputs['Roughness'].default_value = 0.1
             
-        elif any(word in desc_lower for word in ['wood', 'tree', 'bark']):
+        elif material_type == 'wood':
             # Wood material
             principled.inputs['Base Color'].default_value = (0.4, 0.2, 0.1, 1.0)
             principled.inputs['Metallic'].default_value = 0.0
             principled.inputs['Roughness'].default_value = 0.8
             
-        elif any(word in desc_lower for word in ['skin', 'flesh', 'human', 'creature']):
+        elif material_type == 'skin':
             # Skin material
             principled.inputs['Base Color'].default_value = (0.8, 0.6, 0.5, 1.0)
             principled.inputs['Metallic'].default_value = 0.0
@@ -637,7 +1223,7 @@ class SmartBlendAI:
             elif 'Subsurface' in principled.inputs:
                 principled.inputs['Subsurface'].default_value = 0.1
             
-        elif any(word in desc_lower for word in ['stone', 'rock', 'castle', 'building']):
+        elif material_type == 'stone':
             # Stone material
             principled.inputs['Base Color'].default_value = (0.5, 0.5, 0.5, 1.0)
             principled.inputs['Metallic'].default_value = 0.0
@@ -665,17 +1251,18 @@ class SmartBlendAI:
         """Apply materials intelligently based on object and description"""
         for obj in self.imported_objects:
             if obj.type == 'MESH':
-                # Create material based on object name and description
-                material_name = f"Smart_{obj.name}"
-                mat = self.create_smart_material(material_name, f"{obj.name} {description}")
+                # Pick the shared material for the category of object name and description
+                material_type = _MATERIAL_TYPES.classify(f"{obj.name} {description}", 'default')
+                mat = self._get_material_template(material_type)
                 
                 # Clear existing materials and apply new one
                 obj.data.materials.clear()
                 obj.data.materials.append(mat)
-                logger.info(f"Applied smart material to: {obj.name}")
+                logger.debug("Applied smart material %s to: %s", mat.name, obj.name)
     
-    def render_smart_preview(self, filename: str = "smart_preview.png") -> bool:
-        """Render a preview with smart camera positioning"""
+    def render_smart_preview(self, filename: str = "smart_preview.png", engine: str = 'BLENDER_EEVEE_NEXT',
+                             quality: str = 'preview') -> bool:
+        """Render a preview with smart camera positioning (EEVEE at half size on GPU hosts, else Cycles)"""
         try:
             # Ensure we have a camera first
             camera = bpy.data.objects.get('Camera')
@@ -687,39 +1274,24 @@ class SmartBlendAI:
             # Get all mesh objects in the scene to position camera
             mesh_objects = [obj for obj in bpy.data.objects if obj.type == 'MESH']
             
-            if mesh_objects:
-                # Calculate bounding box of all objects
-                all_coords = []
-                for obj in mesh_objects:
-                    for vertex in obj.data.vertices:
-                        world_coord = obj.matrix_world @ vertex.co
-                        all_coords.append(world_coord)
+            # Calculate bounding box of all objects
+            bounds = _world_bbox(mesh_objects)
+            
+            if bounds is not None:
+                min_coords, max_coords = Vector(bounds[0]), Vector(bounds[1])
                 
-                if all_coords:
-                    # Get bounds
-                    min_coords = Vector((min(coord.x for coord in all_coords),
-                                       min(coord.y for coord in all_coords),
-                                       min(coord.z for coord in all_coords)))
-                    max_coords = Vector((max(coord.x for coord in all_coords),
-                                       max(coord.y for coord in all_coords),
-                                       max(coord.z for coord in all_coords)))
-                    
-                    center = (min_coords + max_coords) / 2
-                    size = max_coords - min_coords
-                    distance = max(size) * 2.5  # Increase distance for better framing
-                    
-                    # Update camera position
-                    camera.location = center + Vector((distance, -distance, distance * 0.5))
-                    
-                    # Point camera at center
-                    direction = center - camera.location
-                    camera.rotation_euler = direction.to_track_quat('-Z', 'Y').to_euler()
-                else:
-                    # Default camera position if no coords
-                    camera.location = (7, -7, 5)
-                    camera.rotation_euler = (1.1, 0, 0.785)
+                center = (min_coords + max_coords) / 2
+                size = max_coords - min_coords
+                distance = max(size) * 2.5  # Increase distance for better framing
+                
+                # Update camera position
+                camera.location = center + Vector((distance, -distance, distance * 0.5))
+                
+                # Point camera at center
+                direction = center - camera.location
+                camera.rotation_euler = direction.to_track_quat('-Z', 'Y').to_euler()
             else:
-                # Default camera position if no objects
+                # Default camera position if no objects or vertices
                 camera.location = (7, -7, 5)
                 camera.rotation_euler = (1.1, 0, 0.785)
             
@@ -736,59 +1308,197 @@ class SmartBlendAI:
             scene = bpy.context.scene
             scene.render.filepath = str(self.output_dir / filename)
             scene.render.image_settings.file_format = 'PNG'
+            # Light zlib level: much faster encode for slightly larger files
+            scene.render.image_settings.compression = 15
             scene.render.resolution_x = 1920
             scene.render.resolution_y = 1080
+            
+            if quality == 'final':
+                engine = 'CYCLES'
+                scene.render.resolution_percentage = 100
+            else:
+                # Half resolution renders a quarter of the pixels
+                scene.render.resolution_percentage = 50
+            
+            gpu = self._gpu_available
+            scene.cycles.device = 'GPU' if gpu else 'CPU'
+            if engine.startswith('BLENDER_EEVEE') and not gpu:
+                # EEVEE needs a GPU context; CPU-only background hosts keep rendering with Cycles
+                engine = 'CYCLES'
+            
+            if engine != 'CYCLES':
+                # Rasterized preview: far cheaper than path tracing for a quick look
+                if engine.startswith('BLENDER_EEVEE'):
+                    scene.render.engine = _eevee_engine_id()
+                    scene.eevee.taa_render_samples = 32
+                else:
+                    scene.render.engine = engine
+                bpy.ops.render.render(write_still=True)
+                logger.info("Smart preview rendered: %s", filename)
+                return True
+            
             scene.render.engine = 'CYCLES'
-            scene.cycles.samples = 64
+            _set_tile_size(scene, self.tile_size)
             
-            # Disable denoising (not available in all builds)
-            scene.cycles.use_denoising = False
+            # Adaptive sampling stops converged pixels early; 128 is only the cap
+            scene.cycles.samples = 128
+            scene.cycles.use_adaptive_sampling = True
+            scene.cycles.adaptive_threshold = 0.05
+            scene.cycles.adaptive_min_samples = 16
+            
+            # OIDN with albedo and normal guides cleans up the remaining noise
+            scene.cycles.use_denoising = True
+            scene.cycles.denoiser = 'OPENIMAGEDENOISE'
+            scene.cycles.denoising_input_passes = 'RGB_ALBEDO_NORMAL'
             
             # Render
             bpy.ops.render.render(write_still=True)
-            logger.info(f"Smart preview rendered: {filename}")
+            logger.info("Smart preview rendered: %s", filename)
             return True
             
         except Exception as e:
-            logger.error(f"Smart preview render failed: {e}")
+            logger.error("Smart preview render failed: %s", e)
             return False
     
-    def generate_and_process(self, prompt: str, description: str = "", reference_image: Optional[str] = None) -> bool:
+    def generate_and_process(self, prompt: str, description: str = "", reference_image: Optional[str] = None,
+                             quality: str = 'preview') -> bool:
         """Complete pipeline: generate model, apply materials, render"""
-        logger.info(f"Starting smart generation pipeline for: '{prompt}'")
+        logger.info("Starting smart generation pipeline for: '%s'", prompt)
+        slug = _prompt_slug(prompt)
         if reference_image:
-            logger.info(f"Using reference image: {reference_image}")
+            logger.info("Using reference image: %s", reference_image)
         
         # Generate the 3D model
         model_path = self.generate_model_from_text(prompt, reference_image=reference_image)
         if not model_path:
             logger.error("Failed to generate 3D model")
             return False
+        self.written_files.append(Path(model_path))
         
         # Apply smart materials
         self.apply_smart_materials(f"{prompt} {description}")
         
         # Save as Blender file
-        blend_path = self.output_dir / f"smart_{prompt.replace(' ', '_')}.blend"
+        blend_path = self.output_dir / f"smart_{slug}.blend"
         bpy.ops.wm.save_as_mainfile(filepath=str(blend_path))
+        self.written_files.append(blend_path)
         
         # Render preview
-        preview_name = f"smart_{prompt.replace(' ', '_')}_preview.png"
-        self.render_smart_preview(preview_name)
+        preview_name = f"smart_{slug}_preview.png"
+        if self.render_smart_preview(preview_name, quality=quality):
+            self.written_files.append(self.output_dir / preview_name)
         
         logger.info("Smart generation pipeline completed successfully!")
         return True
 
+def _prompt_slug(prompt: str) -> str:
+    """Path-safe file stem for a prompt, kept distinct from other prompts that clean up the same way"""
+    slug = _SLUG_RE.sub('_', prompt).strip('_')[:64]
+    if slug != prompt.replace(' ', '_'):
+        # Characters were dropped or the name was cut, so append a short prompt hash
+        digest = hashlib.blake2b(prompt.encode(), digest_size=4).hexdigest()
+        slug = f"{slug}_{digest}" if slug else digest
+    return slug
+
+def _move_results(paths: List[Path], dst_dir: Path) -> None:
+    """Move the files this run wrote to durable storage, leaving everything else in place"""
+    dst_dir.mkdir(parents=True, exist_ok=True)
+    moved = 0
+    # A path can be listed twice when a prompt repeats; move each file once
+    for path in dict.fromkeys(paths):
+        if not path.is_file():
+            continue
+        shutil.move(str(path), str(dst_dir / path.name))
+        moved += 1
+    print(f"📦 Moved {moved} results to: {dst_dir}")
+
+def _read_prompts_file(path: Path) -> List[Tuple[str, str, str]]:
+    """Parse 'prompt|description|reference' lines, skipping blanks and # comments"""
+    entries = []
+    for line in path.read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        prompt, description, reference = (line.split('|', 2) + ['', ''])[:3]
+        if prompt.strip():
+            entries.append((prompt.strip(), description.strip(), reference.strip()))
+    return entries
+
+def run_batch(smart_ai: SmartBlendAI, args) -> int:
+    """Generate a slice of a prompts file in this Blender process and return the exit status"""
+    prompts_file = Path(args.prompts_file)
+    if not prompts_file.exists():
+        print(f"❌ Prompts file not found: {prompts_file}")
+        return 1
+    
+    entries = _read_prompts_file(prompts_file)
+    # Blender leaks memory across many generations, so each process handles a bounded slice
+    end = min(args.start + args.max_per_process, len(entries))
+    batch = entries[args.start:end]
+    smart_ai.prepare_prompts([prompt for prompt, _, _ in batch])
+    
+    failed = []
+    for prompt, description, reference in batch:
+        # Per-line fields win over the command line defaults
+        reference = reference or args.reference
+        if reference and not Path(reference).exists():
+            print(f"⚠️ Reference image not found, continuing without it: {reference}")
+            reference = None
+        try:
+            ok = smart_ai.generate_and_process(prompt, description or args.description, reference, args.quality)
+        except Exception as e:
+            # One broken prompt must not end the rest of the slice
+            logger.error("Batch prompt '%s' failed: %s", prompt, e)
+            ok = False
+        if not ok:
+            failed.append(prompt)
+    
+    print(f"✅ Generated {len(batch) - len(failed)}/{len(batch)} prompts. Results in: {args.output}")
+    for prompt in failed:
+        print(f"❌ Failed: {prompt}")
+    if end < len(entries):
+        # Tell the wrapper where the next process should pick up
+        print(f"⏭️ {len(entries) - end} prompts remaining, continue with --start {end}")
+        return BATCH_EXIT_MORE_FAILED if failed else BATCH_EXIT_MORE
+    return 1 if failed else 0
+
 def main():
     """Main function for command line usage"""
     parser = argparse.ArgumentParser(description='Smart BlendAI - AI-Powered 3D Model Generation')
-    parser.add_argument('--prompt', '-p', required=True, help='Text description of what to generate')
+    prompt_source = parser.add_mutually_exclusive_group(required=True)
+    prompt_source.add_argument('--prompt', '-p', help='Text description of what to generate')
+    prompt_source.add_argument('--prompts-file',
+                               help="Generate every 'prompt|description|reference' line of this file in one process")
     parser.add_argument('--description', '-d', default='', help='Additional material/style description')
     parser.add_argument('--reference', '-r', help='Reference image for better accuracy')
-    parser.add_argument('--output', '-o', default='/tmp/blendai_output', help='Output directory')
+    parser.add_argument('--output', '-o',
+                        help='Output directory (default: /tmp/blendai_output, or /dev/shm/blendai_output '
+                             'for batches with --final-output)')
+    parser.add_argument('--final-output', help='Move finished results here once generation is done')
     parser.add_argument('--type', '-t', default='auto', help='Model type hint (auto, character, weapon, building)')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the prompt and output caches')
+    parser.add_argument('--cpu', action='store_true', help='Render on the CPU even if a GPU is available')
+    parser.add_argument('--tile-size', type=int, default=2048, help='Cycles tile size used when rendering on the GPU')
+    parser.add_argument('--quality', choices=['preview', 'final'], default='preview',
+                        help='preview: half-size EEVEE render, final: full-size Cycles render')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='Logging level (default: INFO, or WARNING with --prompts-file)')
+    parser.add_argument('--max-per-process', type=int, default=100,
+                        help=f'Prompts to generate before exiting with status {BATCH_EXIT_MORE} '
+                             f'({BATCH_EXIT_MORE_FAILED} if any failed), so a wrapper can restart Blender')
+    parser.add_argument('--start', type=int, default=0, help='Index of the first prompt to generate from --prompts-file')
     
     args = parser.parse_args()
+    # Batch runs only surface problems unless asked otherwise
+    logging.getLogger().setLevel(args.log_level or ('WARNING' if args.prompts_file else 'INFO'))
+    if args.output is None:
+        # Stage batches in RAM only when --final-output moves the results to durable storage
+        use_shm = args.prompts_file and args.final_output and os.path.ismount('/dev/shm')
+        args.output = '/dev/shm/blendai_output' if use_shm else '/tmp/blendai_output'
+    
+    if args.max_per_process <= 0:
+        print("❌ --max-per-process must be at least 1")
+        sys.exit(1)
     
     # Validate reference image if provided
     if args.reference and not Path(args.reference).exists():
@@ -796,8 +1506,18 @@ def main():
         sys.exit(1)
     
     # Create and run smart BlendAI
-    smart_ai = SmartBlendAI(args.output)
-    success = smart_ai.generate_and_process(args.prompt, args.description, args.reference)
+    # The prompt cache only lives for this process, so only a batch can ever hit it
+    use_semantic_cache = bool(args.prompts_file) and not args.no_cache
+    smart_ai = SmartBlendAI(args.output, use_semantic_cache=use_semantic_cache, use_disk_cache=not args.no_cache,
+                            use_gpu=not args.cpu, tile_size=args.tile_size)
+    if args.prompts_file:
+        status = run_batch(smart_ai, args)
+        if args.final_output:
+            _move_results(smart_ai.written_files, Path(args.final_output))
+        sys.exit(status)
+    success = smart_ai.generate_and_process(args.prompt, args.description, args.reference, args.quality)
+    if args.final_output:
+        _move_results(smart_ai.written_files, Path(args.final_output))
     
     if success:
         print(f"✅ Smart generation completed! Results in: {args.output}")
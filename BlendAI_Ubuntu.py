@@ -7,7 +7,8 @@ import logging
 import argparse
 from pathlib import Path
 from mathutils import Vector
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 
 # Configure logging for server environment
 logging.basicConfig(
@@ -20,26 +21,110 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# No window manager or screens exist when Blender runs with --background
+_HEADLESS = bpy.app.background
+
+# Cycles GPU backends in order of preference
+GPU_DEVICE_TYPES = ('OPTIX', 'CUDA', 'HIP', 'METAL', 'ONEAPI')
+
+def _enable_gpu_rendering(scene) -> bool:
+    """Point Cycles at the first available GPU backend, returning False if there is none"""
+    try:
+        prefs = bpy.context.preferences.addons['cycles'].preferences
+    except KeyError:
+        return False
+    
+    for device_type in GPU_DEVICE_TYPES:
+        try:
+            prefs.compute_device_type = device_type
+        except TypeError:
+            continue
+        # get_devices() must run before the device list is populated
+        prefs.get_devices()
+        gpus = [device for device in prefs.devices if device.type == device_type]
+        if gpus:
+            for device in prefs.devices:
+                device.use = device.type == device_type
+            scene.cycles.device = 'GPU'
+            logger.info("Cycles rendering on %s: %s", device_type, ', '.join(d.name for d in gpus))
+            return True
+    
+    scene.cycles.device = 'CPU'
+    return False
+
+def _set_tile_size(scene, tile_size: int = 2048) -> None:
+    """Use large power-of-two tiles on the GPU so kernel launches stay saturated"""
+    gpu = scene.cycles.device == 'GPU'
+    if hasattr(scene.cycles, 'tile_size'):
+        # Blender 3.0+ replaced tile_x/tile_y with one tile_size used by auto tiling
+        if gpu:
+            scene.cycles.tile_size = tile_size
+    else:
+        scene.render.tile_x = scene.render.tile_y = 256 if gpu else 32
+
+def _load_image(path: Path) -> bpy.types.Image:
+    """Return the image data-block for a file, loading it only if it is not in memory yet"""
+    path = Path(path)
+    img = bpy.data.images.get(path.name)
+    if img is not None and img.filepath and Path(bpy.path.abspath(img.filepath)).resolve() == path.resolve():
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Reused image %s", img.name)
+        return img
+    # check_existing also finds the file when it was loaded under another data-block name
+    return bpy.data.images.load(str(path), check_existing=True)
+
+def _mesh_coords_np(obj) -> Tuple[np.ndarray, np.ndarray]:
+    """Local vertex coordinates as a contiguous (N, 3) float32 array, plus the 4x4 world matrix"""
+    n = len(obj.data.vertices)
+    co = np.empty(n * 3, dtype=np.float32)
+    obj.data.vertices.foreach_get("co", co)
+    return co.reshape(n, 3), np.array(obj.matrix_world, dtype=np.float32)
+
+def _world_bbox(objs) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """World-space (min, max) corners of all mesh objects, or None if there are no vertices"""
+    mins, maxs = [], []
+    for obj in objs:
+        if obj.type != 'MESH' or not obj.data.vertices:
+            continue
+        co, m = _mesh_coords_np(obj)
+        world = co @ m[:3, :3].T + m[:3, 3]
+        mins.append(world.min(axis=0))
+        maxs.append(world.max(axis=0))
+    
+    if not mins:
+        return None
+    return np.min(mins, axis=0), np.max(maxs, axis=0)
+
 class BlendAISetup:
     """Smart Blender setup class for character model workflow - Ubuntu Server Compatible"""
     
-    def __init__(self, base_model_path: str, reference_image_path: str, output_dir: str = "/tmp/blendai_output"):
+    # Materials built by create_advanced_material, shared across instances
+    _material_cache: Dict[str, bpy.types.Material] = {}
+    
+    def __init__(self, base_model_path: str, reference_image_path: str, output_dir: str = "/tmp/blendai_output",
+                 use_gpu: bool = True, tile_size: int = 2048):
         self.base_model_path = Path(base_model_path)
         self.reference_image_path = Path(reference_image_path)
         self.output_dir = Path(output_dir)
         self.imported_objects: List[bpy.types.Object] = []
         self.reference_plane: Optional[bpy.types.Object] = None
+        self._ref_material: Optional[bpy.types.Material] = None
+        self.use_gpu = use_gpu
+        self.tile_size = tile_size
         
         # Create output directory
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Keep Cycles' scene sync (BVH, textures, compiled shaders) between renders
+        bpy.context.scene.render.use_persistent_data = True
+        
     def validate_files(self) -> bool:
         """Validate that required files exist"""
         if not self.base_model_path.exists():
-            logger.error(f"Base model not found: {self.base_model_path}")
+            logger.error("Base model not found: %s", self.base_model_path)
             return False
         if not self.reference_image_path.exists():
-            logger.error(f"Reference image not found: {self.reference_image_path}")
+            logger.error("Reference image not found: %s", self.reference_image_path)
             return False
         logger.info("All files validated successfully")
         return True
@@ -52,99 +137,77 @@ class BlendAISetup:
         else:
             objects_to_delete = list(bpy.context.scene.objects)
         
-        # Use bmesh for efficient deletion
-        bpy.ops.object.select_all(action='DESELECT')
-        for obj in objects_to_delete:
-            obj.select_set(True)
-        bpy.ops.object.delete()
-        logger.info(f"Cleared {len(objects_to_delete)} objects from scene")
+        # One C-level removal instead of selecting and deleting through operators
+        bpy.data.batch_remove(ids=objects_to_delete)
+        logger.info("Cleared %s objects from scene", len(objects_to_delete))
     
     def import_model(self) -> bool:
         """Import FBX model with error handling"""
         try:
-            # Store objects before import to identify new ones
-            objects_before = set(bpy.context.scene.objects)
-            
             bpy.ops.import_scene.fbx(filepath=str(self.base_model_path))
             
-            # Find newly imported objects
-            objects_after = set(bpy.context.scene.objects)
-            self.imported_objects = list(objects_after - objects_before)
+            # The FBX importer deselects everything and selects exactly what it created
+            self.imported_objects = list(bpy.context.selected_objects)
             
             if not self.imported_objects:
                 logger.error("No objects were imported from FBX file")
                 return False
                 
-            logger.info(f"Successfully imported {len(self.imported_objects)} objects")
+            logger.info("Successfully imported %s objects", len(self.imported_objects))
             return True
             
         except Exception as e:
-            logger.error(f"Failed to import model: {e}")
+            logger.error("Failed to import model: %s", e)
             return False
     
+    def _center_model_on_origin(self, objs: List[bpy.types.Object]) -> None:
+        """Translate mesh vertices so the vertex centroid of all objects sits at the world origin"""
+        meshes = {}
+        for obj in objs:
+            # Shared mesh data must only be shifted once
+            if obj.type == 'MESH' and obj.data.vertices and obj.data not in meshes:
+                meshes[obj.data] = (obj, *_mesh_coords_np(obj))
+        if not meshes:
+            return
+        
+        total = np.zeros(3, dtype=np.float64)
+        count = 0
+        for _, co, m in meshes.values():
+            total += (co @ m[:3, :3].T + m[:3, 3]).sum(axis=0, dtype=np.float64)
+            count += len(co)
+        centroid = total / count
+        
+        centered = 0
+        for mesh, (obj, co, m) in meshes.items():
+            # Express the world-space offset in the object's local space
+            try:
+                local_offset = np.linalg.solve(m[:3, :3].astype(np.float64), -centroid).astype(np.float32)
+            except np.linalg.LinAlgError:
+                # Zero scale on some axis: no local offset can move it, so leave this object alone
+                logger.warning("Skipping %s while centering: its transform is not invertible", obj.name)
+                continue
+            mesh.vertices.foreach_set("co", (co + local_offset).ravel())
+            mesh.update()
+            centered += 1
+        
+        logger.info("Centered %s meshes on origin (offset %s)", centered, tuple(np.round(-centroid, 4)))
+    
     def setup_reference_image(self) -> bool:
         """Import and position reference image intelligently"""
-        try:
-            # Check if addon is available (might not be in headless mode)
-            if 'import_image' not in dir(bpy.ops):
-                logger.warning("Import Images as Planes addon not available in headless mode")
-                return self._create_reference_plane_manually()
-            
-            objects_before = set(bpy.context.scene.objects)
-            
-            bpy.ops.import_image.to_plane(
-                files=[{"name": self.reference_image_path.name}],
-                directory=str(self.reference_image_path.parent),
-                align_axis='Z+',
-                size_mode='CAMERA'
-            )
-            
-            # Find the reference plane
-            objects_after = set(bpy.context.scene.objects)
-            new_objects = list(objects_after - objects_before)
-            
-            if new_objects:
-                self.reference_plane = new_objects[0]
-                # Position reference plane smartly based on model bounds
-                self._position_reference_plane()
-                logger.info("Reference image imported and positioned")
-                return True
-            else:
-                logger.error("Failed to import reference image")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Failed to setup reference image: {e}")
-            return self._create_reference_plane_manually()
+        # Build the plane directly; the Images as Planes addon is slower and often missing headless
+        return self._create_reference_plane_manually()
     
     def _create_reference_plane_manually(self) -> bool:
-        """Create reference plane manually when addon is not available"""
+        """Create a textured reference plane from shader nodes"""
         try:
             # Create a plane
             bpy.ops.mesh.primitive_plane_add(size=2, location=(0, 0, 0))
             self.reference_plane = bpy.context.active_object
             self.reference_plane.name = "Reference_Plane"
             
-            # Create material and load image
-            mat = bpy.data.materials.new(name="Reference_Material")
-            mat.use_nodes = True
-            nodes = mat.node_tree.nodes
-            
-            # Clear default nodes
-            nodes.clear()
-            
-            # Add nodes
-            output = nodes.new('ShaderNodeOutputMaterial')
-            principled = nodes.new('ShaderNodeBsdfPrincipled')
-            tex_image = nodes.new('ShaderNodeTexImage')
-            
-            # Load image
-            img = bpy.data.images.load(str(self.reference_image_path))
-            tex_image.image = img
-            
-            # Link nodes
-            mat.node_tree.links.new(tex_image.outputs['Color'], principled.inputs['Base Color'])
-            mat.node_tree.links.new(principled.outputs['BSDF'], output.inputs['Surface'])
+            # Load image into the shared reference material
+            img = _load_image(self.reference_image_path)
+            mat = self._get_reference_material(img)
             
             # Assign material
             self.reference_plane.data.materials.append(mat)
@@ -156,30 +219,50 @@ class BlendAISetup:
             return True
             
         except Exception as e:
-            logger.error(f"Failed to create reference plane manually: {e}")
+            logger.error("Failed to create reference plane manually: %s", e)
             return False
     
+    def _get_reference_material(self, image: bpy.types.Image) -> bpy.types.Material:
+        """Return the shared reference material, building its node tree only once"""
+        mat = self._ref_material
+        if mat is None or mat.name not in bpy.data.materials:
+            # Adopt a reference material an earlier run left in the file before building one
+            mat = bpy.data.materials.get("Reference_Material")
+            if mat is not None and mat.node_tree and 'RefImageTex' in mat.node_tree.nodes:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Reused material %s", mat.name)
+            else:
+                mat = bpy.data.materials.new(name="Reference_Material")
+                mat.use_nodes = True
+                nodes = mat.node_tree.nodes
+                nodes.clear()
+            
+                # Add nodes
+                output = nodes.new('ShaderNodeOutputMaterial')
+                principled = nodes.new('ShaderNodeBsdfPrincipled')
+                tex_image = nodes.new('ShaderNodeTexImage')
+                tex_image.name = 'RefImageTex'
+            
+                # Link nodes
+                mat.node_tree.links.new(tex_image.outputs['Color'], principled.inputs['Base Color'])
+                mat.node_tree.links.new(principled.outputs['BSDF'], output.inputs['Surface'])
+            self._ref_material = mat
+        
+        # Only the image differs between reference planes
+        mat.node_tree.nodes['RefImageTex'].image = image
+        return mat
+    
     def _position_reference_plane(self) -> None:
         """Position reference plane based on imported model bounds"""
         if not self.imported_objects or not self.reference_plane:
             return
         
         # Calculate bounding box of all imported objects
-        all_coords = []
-        for obj in self.imported_objects:
-            if obj.type == 'MESH':
-                for vertex in obj.data.vertices:
-                    world_coord = obj.matrix_world @ vertex.co
-                    all_coords.append(world_coord)
-        
-        if all_coords:
+        bounds = _world_bbox(self.imported_objects)
+        
+        if bounds is not None:
             # Get model dimensions
-            min_coords = Vector((min(coord.x for coord in all_coords),
-                               min(coord.y for coord in all_coords),
-                               min(coord.z for coord in all_coords)))
-            max_coords = Vector((max(coord.x for coord in all_coords),
-                               max(coord.y for coord in all_coords),
-                               max(coord.z for coord in all_coords)))
+            min_coords, max_coords = Vector(bounds[0]), Vector(bounds[1])
             
             model_width = max_coords.x - min_coords.x
             
@@ -189,9 +272,14 @@ class BlendAISetup:
     
     def create_advanced_material(self, material_name: str = "AdvancedRustMetal") -> bpy.types.Material:
         """Create an advanced procedural rust metal material"""
-        # Remove existing material with same name
-        if material_name in bpy.data.materials:
-            bpy.data.materials.remove(bpy.data.materials[material_name])
+        # Reuse the node tree built earlier if it is still in this file
+        existing = bpy.data.materials.get(material_name)
+        if existing is not None and self._material_cache.get(material_name) == existing:
+            return existing
+        
+        # Remove a same-named material that this class did not build
+        if existing is not None:
+            bpy.data.materials.remove(existing)
         
         mat = bpy.data.materials.new(material_name)
         mat.use_nodes = True
@@ -254,7 +342,8 @@ class BlendAISetup:
         links.new(mix_rgb.outputs['Color'], principled.inputs['Base Color'])
         links.new(principled.outputs['BSDF'], output.inputs['Surface'])
         
-        logger.info(f"Created advanced material: {material_name}")
+        self._material_cache[material_name] = mat
+        logger.info("Created advanced material: %s", material_name)
         return mat
     
     def apply_materials_intelligently(self) -> None:
@@ -264,56 +353,58 @@ class BlendAISetup:
         mesh_objects = [obj for obj in self.imported_objects if obj.type == 'MESH']
         
         for obj in mesh_objects:
-            # Clear existing materials
-            obj.data.materials.clear()
-            # Apply new material
-            obj.data.materials.append(material)
-            logger.info(f"Applied material to object: {obj.name}")
+            materials = obj.data.materials
+            if len(materials) == 1:
+                # Swap the single slot in place; clearing would reset polygon slot indices
+                materials[0] = material
+            else:
+                materials.clear()
+                materials.append(material)
+        
+        logger.info("Applied %s to %s objects", material.name, len(mesh_objects))
     
     def setup_optimal_viewport(self) -> None:
         """Setup optimal viewport settings for character modeling"""
-        # In headless mode, this might not work, so wrap in try-except
-        try:
-            # Set to front view
-            for area in bpy.context.screen.areas:
-                if area.type == 'VIEW_3D':
-                    for region in area.regions:
-                        if region.type == 'WINDOW':
-                            override = bpy.context.copy()
-                            override['area'] = area
-                            override['region'] = region
-                            with bpy.context.temp_override(**override):
-                                bpy.ops.view3d.view_axis(type='FRONT')
-                                # Set viewport shading to material preview
-                                area.spaces[0].shading.type = 'MATERIAL'
-                                # Enable overlays
-                                area.spaces[0].overlay.show_overlays = True
-                    break
-            
-            logger.info("Viewport configured for optimal character modeling")
-        except Exception as e:
-            logger.warning(f"Viewport setup skipped (headless mode?): {e}")
+        if _HEADLESS or bpy.context.screen is None:
+            logger.info("Headless mode: skipping viewport setup")
+            return
+        
+        # Set to front view
+        for area in bpy.context.screen.areas:
+            if area.type == 'VIEW_3D':
+                for region in area.regions:
+                    if region.type == 'WINDOW':
+                        with bpy.context.temp_override(area=area, region=region):
+                            bpy.ops.view3d.view_axis(type='FRONT')
+                            # Set viewport shading to material preview
+                            area.spaces[0].shading.type = 'MATERIAL'
+                            # Enable overlays
+                            area.spaces[0].overlay.show_overlays = True
+                break
+        
+        logger.info("Viewport configured for optimal character modeling")
     
     def save_result(self, filename: str = "BlendAI_Result.blend") -> bool:
         """Save the result to output directory"""
         try:
             output_path = self.output_dir / filename
             bpy.ops.wm.save_as_mainfile(filepath=str(output_path))
-            logger.info(f"Saved result to: {output_path}")
+            logger.info("Saved result to: %s", output_path)
             return True
         except Exception as e:
-            logger.error(f"Failed to save result: {e}")
+            logger.error("Failed to save result: %s", e)
             return False
     
     def export_fbx(self, filename: str = "BlendAI_Export.fbx") -> bool:
         """Export the result as FBX"""
         try:
             output_path = self.output_dir / filename
-            bpy.ops.export_scene.fbx(filepath=str(output_path))
-            logger.info(f"Exported FBX to: {output_path}")
+            # Export the whole scene directly rather than filtering by selection or collection
+            bpy.ops.export_scene.fbx(filepath=str(output_path), use_selection=False, use_active_collection=False)
+            logger.info("Exported FBX to: %s", output_path)
             return True
         except Exception as e:
-            logger.error(f"Failed to export FBX: {e}")
+            logger.error("Failed to export FBX: %s", e)
             return False
     
     def render_preview(self, filename: str = "BlendAI_Preview.png") -> bool:
@@ -328,15 +419,28 @@ class BlendAISetup:
             scene.render.resolution_x = 1920
             scene.render.resolution_y = 1080
             
+            # Cycles renders headless on CPU and GPU alike, so --cpu and --tile-size apply
+            scene.render.engine = 'CYCLES'
+            if self.use_gpu:
+                _enable_gpu_rendering(scene)
+            _set_tile_size(scene, self.tile_size)
+            # Adaptive sampling stops converged pixels early; 128 is only the cap
+            scene.cycles.samples = 128
+            scene.cycles.use_adaptive_sampling = True
+            scene.cycles.adaptive_threshold = 0.05
+            scene.cycles.adaptive_min_samples = 16
+            scene.cycles.use_denoising = True
+            
             # Render
             bpy.ops.render.render(write_still=True)
-            logger.info(f"Rendered preview to: {output_path}")
+            logger.info("Rendered preview to: %s", output_path)
             return True
         except Exception as e:
-            logger.error(f"Failed to render preview: {e}")
+            logger.error("Failed to render preview: %s", e)
             return False
     
-    def run_complete_setup(self, save_blend: bool = True, export_fbx: bool = True, render_preview: bool = True) -> bool:
+    def run_complete_setup(self, save_blend: bool = True, export_fbx: bool = True, render_preview: bool = True,
+                           center_model: bool = False) -> bool:
         """Execute the complete smart setup workflow"""
         logger.info("Starting BlendAI smart setup for Ubuntu Server...")
         
@@ -350,6 +454,10 @@ class BlendAISetup:
         if not self.import_model():
             return False
         
+        # Recenter before the reference plane is positioned against the model bounds
+        if center_model:
+            self._center_model_on_origin(self.imported_objects)
+        
         # Setup reference image
         if not self.setup_reference_image():
             logger.warning("Reference image setup failed, continuing without it")
@@ -388,15 +496,23 @@ def main():
     parser.add_argument('--no-save', action='store_true', help='Skip saving .blend file')
     parser.add_argument('--no-export', action='store_true', help='Skip FBX export')
     parser.add_argument('--no-render', action='store_true', help='Skip preview render')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO',
+                        help='Logging level')
+    parser.add_argument('--center-model', action='store_true', help='Move the imported model to the world origin')
+    parser.add_argument('--cpu', action='store_true', help='Render on the CPU even if a GPU is available')
+    parser.add_argument('--tile-size', type=int, default=2048, help='Cycles tile size used when rendering on the GPU')
     
     args = parser.parse_args()
+    logging.getLogger().setLevel(args.log_level)
     
     # Create and run setup
-    setup = BlendAISetup(args.model, args.reference, args.output)
+    setup = BlendAISetup(args.model, args.reference, args.output, use_gpu=not args.cpu,
+                         tile_size=args.tile_size)
     success = setup.run_complete_setup(
         save_blend=not args.no_save,
         export_fbx=not args.no_export,
-        render_preview=not args.no_render
+        render_preview=not args.no_render,
+        center_model=args.center_model
     )
     
     # Exit with appropriate code
@@ -18,6 +18,7 @@ SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 SMART_SCRIPT="${SCRIPT_DIR}/BlendAI_Smart.py"
 DEFAULT_OUTPUT_DIR="/tmp/blendai_smart_output"
 BLENDER_EXECUTABLE="blender"
+BATCH_MAX_PER_PROCESS=100
 
 print_header() {
     echo -e "${PURPLE}"
@@ -210,26 +211,36 @@ batch_generate() {
     fi
     
     print_status "📦 Starting batch generation from: $input_file"
+    mkdir -p "$output_dir"
     
-    local count=0
-    local success=0
-    
-    while IFS='|' read -r prompt description || [ -n "$prompt" ]; do
-        # Skip empty lines and comments
-        [[ -z "$prompt" || "$prompt" =~ ^#.*$ ]] && continue
-        
-        count=$((count + 1))
-        echo
-        print_status "🔄 Processing item $count: '$prompt'"
+    # One Blender process generates up to BATCH_MAX_PER_PROCESS prompts, then exits with
+    # status 3 (4 if some failed) if lines remain so a fresh process picks up the rest
+    local start=0
+    local status
+    local failed=false
+    while true; do
+        status=0
+        # --python-exit-code makes an uncaught traceback fail the slice instead of exiting 0
+        "$BLENDER_EXECUTABLE" --background --python-exit-code 1 --python "$SMART_SCRIPT" -- \
+            --prompts-file "$input_file" --output "$output_dir" \
+            --start "$start" --max-per-process "$BATCH_MAX_PER_PROCESS" || status=$?
         
-        if generate_model "$prompt" "$description" "$output_dir"; then
-            success=$((success + 1))
+        if [ "$status" -eq 3 ] || [ "$status" -eq 4 ]; then
+            [ "$status" -eq 4 ] && failed=true
+            start=$((start + BATCH_MAX_PER_PROCESS))
+            print_status "🔁 Restarting Blender at prompt $start"
+            continue
         fi
-        
-    done < "$input_file"
+        break
+    done
     
     echo
-    print_success "📊 Batch complete: $success/$count successful generations"
+    if [ "$status" -eq 0 ] && [ "$failed" = false ]; then
+        print_success "📊 Batch complete: all prompts generated in $output_dir"
+    else
+        print_error "📊 Batch finished with failures, see the log above"
+        return 1
+    fi
 }
 
 # Create example prompts file
@@ -238,7 +249,7 @@ create_examples_file() {
     
     cat > "$examples_file" << 'EOF'
 # Smart BlendAI Example Prompts
-# Format: prompt|description (description is optional)
+# Format: prompt|description|reference_image_path (description and reference are optional)
 # Lines starting with # are comments
 
 # Weapons